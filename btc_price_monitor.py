@@ -7,16 +7,43 @@
 """
 
 import os
+import sys
 import json
+import atexit
 import time
+import random
+import socket
+import functools
+import logging
+import threading
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Set, Tuple
+
+try:
+    import orjson  # 可选依赖：更快的 JSON 编解码
+except ImportError:
+    orjson = None
+
+try:
+    import websocket  # 可选依赖（websocket-client）：本地模式下接收行情推送
+except ImportError:
+    websocket = None
+
+logger = logging.getLogger('btc')
 
 # ==================== 配置区域 ====================
 # 企业微信机器人 Webhook URL
 # 获取方式：在企业微信群中添加机器人，获取 Webhook URL
-WECHAT_WEBHOOK_URL = os.getenv('WECHAT_WEBHOOK_URL', '')
+WECHAT_WEBHOOK_URL = os.getenv('WECHAT_WEBHOOK_URL', '').strip()
 
 # 检查间隔（秒）- 建议设置为30-60秒
 CHECK_INTERVAL_SECONDS = 30
@@ -26,15 +53,129 @@ PRICE_CHANGE_THRESHOLD = 500  # 涨跌超过此金额时提醒（美元）
 
 # 今日最大涨跌阈值（美元）
 DAILY_MAX_CHANGE_THRESHOLD = 2000
+# 价格提醒消息中最多列出的今日涨跌事件条数（取最近的）
+MESSAGE_MAX_EVENTS = 10
+
+# 同一分钟内价格变化小于此值（美元）且未突破今日区间时，跳过本轮检查
+IDLE_PRICE_DELTA = 0.5
 
 # ==================== API 配置 ====================
-BINANCE_API_URL = 'https://api.binance.com/api/v3/ticker/price'
-BINANCE_24H_STATS_URL = 'https://api.binance.com/api/v3/ticker/24hr'
+# 币安现货API的候选主机，定期测速后使用延迟最低的一个（见 select_spot_base）
+BINANCE_SPOT_BASE_CANDIDATES = [
+    'https://api.binance.com',
+    'https://api1.binance.com',
+    'https://api2.binance.com',
+    'https://api3.binance.com',
+    'https://api4.binance.com',
+]
+BINANCE_SPOT_BASE_URL = BINANCE_SPOT_BASE_CANDIDATES[0]
+# 交易对固定为 BTCUSDT，查询参数直接写在地址中
+BINANCE_24H_STATS_PATH = '/api/v3/ticker/24hr?symbol=BTCUSDT'
+BINANCE_24H_STATS_URL = BINANCE_SPOT_BASE_URL + BINANCE_24H_STATS_PATH
+# 重新测速选择现货主机的间隔（秒）
+SPOT_BASE_PROBE_INTERVAL_SECONDS = 3600
+_spot_base_probed_at: Optional[float] = None
 
 # 币安期货API（用于爆仓监控）
-BINANCE_FUTURES_OPEN_INTEREST_URL = 'https://fapi.binance.com/fapi/v1/openInterest'
-BINANCE_FUTURES_PREMIUM_INDEX_URL = 'https://fapi.binance.com/fapi/v1/premiumIndex'
-BINANCE_FUTURES_24H_STATS_URL = 'https://fapi.binance.com/fapi/v1/ticker/24hr'
+BINANCE_FUTURES_OPEN_INTEREST_URL = 'https://fapi.binance.com/fapi/v1/openInterest?symbol=BTCUSDT'
+BINANCE_FUTURES_PREMIUM_INDEX_URL = 'https://fapi.binance.com/fapi/v1/premiumIndex?symbol=BTCUSDT'
+BINANCE_FUTURES_24H_STATS_URL = 'https://fapi.binance.com/fapi/v1/ticker/24hr?symbol=BTCUSDT'
+BINANCE_FUTURES_PING_URL = 'https://fapi.binance.com/fapi/v1/ping'
+
+# 币安 WebSocket 推送（本地运行模式使用，每秒推送一次）
+BINANCE_WS_TICKER_URL = 'wss://stream.binance.com:9443/ws/btcusdt@ticker'  # 现货24小时行情
+BINANCE_WS_MARK_PRICE_URL = 'wss://fstream.binance.com/ws/btcusdt@markPrice@1s'  # 期货标记价格和资金费率
+
+# ==================== HTTP 连接配置 ====================
+# 遇到这些状态码时自动重试（仅限 GET 等幂等请求，企业微信的 POST 不会重试）
+RETRY_STATUS_CODES = [500, 502, 503, 504]
+# 429/418（限频/封禁）既不在上面的列表中，也关闭了 urllib3 按 Retry-After 自动重试
+# （respect_retry_after_header=False，否则带 Retry-After 的 429 仍会被原地等待并重试），
+# 只发出一次请求，由 update_backoff 统一退避，避免立即重试加重处罚
+
+# 币安限频（429）和因无视限频被临时封禁（418）的状态码，收到后暂停该 Session 的所有请求
+BACKOFF_STATUS_CODES = (418, 429)
+# 退避时长从 CHECK_INTERVAL_SECONDS 开始按连续次数翻倍，最长不超过此值（秒）
+BACKOFF_MAX_SECONDS = 15 * 60
+
+# 请求超时（秒）：建立连接和等待响应分开计时，连接阶段卡住时尽快失败
+CONNECT_TIMEOUT = 3.05  # 略大于 TCP 重传间隔（3 秒）
+READ_TIMEOUT = 10
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 本地运行模式下，两次检查之间每隔多少秒 ping 一次币安接口，保持连接不被中间设备回收
+HEARTBEAT_INTERVAL_SECONDS = 10
+# TCP keepalive 空闲多少秒后开始发送探测包（仅支持 TCP_KEEPIDLE 的系统生效）
+TCP_KEEPIDLE_SECONDS = 10
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """为连接开启 TCP keepalive 的 HTTPAdapter"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPIDLE_SECONDS))
+        kwargs['socket_options'] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_session(pool_connections: int = 4) -> requests.Session:
+    """
+    创建带连接池和重试策略的 Session，保持 keep-alive，避免每次检查都重新建立 TCP+TLS 连接
+    
+    Args:
+        pool_connections: 缓存连接池的主机数，访问的主机多于此数时最久未用的主机连接会被丢弃
+    """
+    session = requests.Session()
+    session.mount('https://', KeepAliveAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=RETRY_STATUS_CODES,
+                          respect_retry_after_header=False),
+    ))
+    session.headers['Accept-Encoding'] = 'gzip'
+    return session
+
+
+# 每个主机一个 Session：币安现货、币安期货、企业微信
+# 现货 Session 会在各候选主机之间切换，为每个候选主机都保留连接池
+SPOT_SESSION = create_session(pool_connections=len(BINANCE_SPOT_BASE_CANDIDATES))
+FUTURES_SESSION = create_session()
+WECHAT_SESSION = create_session()
+# 企业微信只接收 POST 的 JSON 消息体，请求体由 send_wechat_message 预先编码
+WECHAT_SESSION.headers['Content-Type'] = 'application/json; charset=utf-8'
+
+# 现货主机测速专用 Session：不重试，超时即视为该主机不可用，也不会挤掉 SPOT_SESSION 中保持的连接
+PROBE_SESSION = requests.Session()
+PROBE_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=len(BINANCE_SPOT_BASE_CANDIDATES),
+    pool_maxsize=1,
+    max_retries=0,
+))
+
+
+def close_sessions():
+    """关闭所有 Session，释放连接池中的连接（进程退出时自动调用）"""
+    for session in (SPOT_SESSION, FUTURES_SESSION, WECHAT_SESSION, PROBE_SESSION):
+        session.close()
+
+
+atexit.register(close_sessions)
+
+# 限频退避状态，按 Session 分别记录（现货和期货的限频额度互相独立）
+_backoff_until: Dict[requests.Session, float] = {}  # 退避结束时间（time.monotonic）
+_backoff_level: Dict[requests.Session, int] = {}  # 连续触发限频的次数
+
+# 并发请求线程池：期货接口互相独立，并行请求时等待时间从各接口耗时之和降为最慢的一个
+FETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='btc-fetch')
+
+# ==================== DNS 缓存 ====================
+# 进程内缓存以下主机的解析结果（秒），系统解析器缓存失效时也不必每次请求都多一次 DNS 往返
+DNS_CACHE_TTL_SECONDS = 300
+_dns_cache: Dict[Tuple, Tuple[float, list]] = {}
+_system_getaddrinfo = socket.getaddrinfo
+_pinned_hosts: Set[str] = set()
 
 # ==================== 爆仓监控配置 ====================
 # 未平仓合约量变化阈值（百分比）
@@ -49,81 +190,391 @@ FUNDING_RATE_LOW_THRESHOLD = -0.1  # -0.1% 视为异常低
 RAPID_CHANGE_TIME_WINDOW = 60  # 1分钟内
 # 快速涨跌阈值（百分比）- 类似coinglass的声音提醒机制
 RAPID_CHANGE_THRESHOLD = 2.0  # 1分钟内涨跌超过2%触发提醒
+# 价格历史最多保留的记录数（按每秒一条估算约10分钟，正常只保留最近约6分钟）
+PRICE_HISTORY_MAXLEN = 600
+
+# ==================== 行情快照缓存 ====================
+# 同一轮检查内复用行情快照的有效期（秒）
+SNAPSHOT_TTL_SECONDS = CHECK_INTERVAL_SECONDS // 2
+_last_snapshot: Optional[Dict] = None
+_last_snapshot_at = 0.0
+
+# WebSocket 推送的行情超过此时间（秒）未更新时视为过期，回退到 REST 接口
+STREAM_STALE_SECONDS = 10
+# WebSocket 断线后的重连间隔（秒）
+STREAM_RECONNECT_SECONDS = 5
+_stream_snapshot: Optional[Dict] = None
+_stream_snapshot_at = 0.0
+_stream_funding: Optional[Dict] = None
+_stream_funding_at = 0.0
+
+# ==================== 接口结果缓存 ====================
+# 各接口 REST 结果的缓存有效期（秒），告警较多时也不会重复请求变化缓慢的数据
+OPEN_INTEREST_TTL_SECONDS = CHECK_INTERVAL_SECONDS // 2
+FUNDING_RATE_TTL_SECONDS = 60  # 资金费率每8小时结算一次，预测值变化缓慢
+FUTURES_24H_STATS_TTL_SECONDS = 60
 
 # ==================== 状态文件路径 ====================
 STATE_FILE = 'btc_price_state.json'
+# 今日涨跌事件和爆仓提醒记录最多保留的条数，超出后丢弃最早的记录
+DAILY_RECORDS_MAXLEN = 200
+# 上次写入状态文件的内容，用于跳过重复写盘
+_last_state_bytes: Optional[bytes] = None
+
+# ==================== 时区 ====================
+BEIJING_TZ = timezone(timedelta(hours=8))
+# 北京时间字符串格式
+BEIJING_TIME_FMT = '%Y-%m-%d %H:%M:%S'
 
 
 def get_beijing_time() -> str:
     """获取北京时间（UTC+8）"""
-    beijing_tz = timezone(timedelta(hours=8))
-    beijing_time = datetime.now(beijing_tz)
-    return beijing_time.strftime('%Y-%m-%d %H:%M:%S')
+    return datetime.now(BEIJING_TZ).strftime(BEIJING_TIME_FMT)
 
 
 def get_beijing_datetime() -> datetime:
     """获取北京时间的datetime对象"""
-    beijing_tz = timezone(timedelta(hours=8))
-    return datetime.now(beijing_tz)
+    return datetime.now(BEIJING_TZ)
+
+
+def get_pinned_hosts(include_spot_mirrors: bool = True) -> Set[str]:
+    """
+    需要缓存 DNS 解析结果的主机（币安现货/期货接口和企业微信 Webhook）
+    
+    Args:
+        include_spot_mirrors: 是否包含所有现货候选主机；为 False 时只包含当前使用的现货主机
+    """
+    spot_urls = BINANCE_SPOT_BASE_CANDIDATES if include_spot_mirrors else [BINANCE_SPOT_BASE_URL]
+    urls = spot_urls + [BINANCE_FUTURES_OPEN_INTEREST_URL, WECHAT_WEBHOOK_URL]
+    return {urlparse(url).hostname for url in urls if url} - {None}
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """socket.getaddrinfo 的缓存版本，只缓存 get_pinned_hosts 中的主机"""
+    if host not in _pinned_hosts:
+        return _system_getaddrinfo(host, port, family, type, proto, flags)
+    
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    cached = _dns_cache.get(key)
+    if cached is not None and now - cached[0] < DNS_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    result = _system_getaddrinfo(host, port, family, type, proto, flags)
+    _dns_cache[key] = (now, result)
+    return result
+
+
+def prewarm_dns(include_spot_mirrors: bool = True):
+    """
+    安装进程内 DNS 缓存，并在启动时预先解析需要访问的主机
+    
+    Args:
+        include_spot_mirrors: 是否预解析所有现货候选主机（只有本地运行模式会测速切换主机）
+    """
+    global _pinned_hosts
+    
+    _pinned_hosts = get_pinned_hosts(include_spot_mirrors)
+    socket.getaddrinfo = _cached_getaddrinfo
+    for host in _pinned_hosts:
+        try:
+            # 与 urllib3 建立连接时的调用参数保持一致，才能命中缓存
+            socket.getaddrinfo(host, 443, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError as e:
+            logger.warning("预解析 %s 失败: %s", host, e)
+
+
+def to_json_bytes(obj: Any) -> bytes:
+    """序列化为 UTF-8 编码的 JSON（已安装 orjson 时使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def from_json_bytes(data: bytes) -> Any:
+    """解析 UTF-8 编码的 JSON（已安装 orjson 时使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
+def ttl_cache(seconds: float):
+    """
+    按参数缓存函数返回值的装饰器，有效期按 time.monotonic 计时
+    
+    返回 None（请求失败）时不缓存，下次调用会重新请求。
+    
+    Args:
+        seconds: 缓存有效期（秒）
+    """
+    def decorator(func):
+        cache: Dict[Tuple, Tuple[Any, float]] = {}  # 参数 -> (返回值, 过期时间)
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            cached = cache.get(args)
+            if cached is not None and now < cached[1]:
+                return cached[0]
+            value = func(*args)
+            if value is not None:
+                cache[args] = (value, now + seconds)
+            return value
+        
+        return wrapper
+    return decorator
+
+
+def raise_if_backing_off(session: requests.Session):
+    """该 Session 处于限频退避期间时抛出 RuntimeError，不再向币安发送请求"""
+    remaining = _backoff_until.get(session, 0.0) - time.monotonic()
+    if remaining > 0:
+        raise RuntimeError(f"触发币安限频，退避中（剩余 {remaining:.0f} 秒）")
 
-def get_btc_price() -> Optional[float]:
+
+def update_backoff(session: requests.Session, response: requests.Response):
     """
-    从币安API获取BTC当前价格
+    根据响应状态更新该 Session 的限频退避状态
+    
+    收到 429/418 时暂停请求 max(Retry-After, CHECK_INTERVAL_SECONDS * 2^n) 秒（n 为连续触发次数，
+    上限 BACKOFF_MAX_SECONDS）并加上随机抖动。连续次数只在 get_json 的正常数据请求成功后重置，
+    权重很低的 ping（测速、心跳）成功不算，否则退避结束后的第一次心跳就会把翻倍清零。
+    
+    Args:
+        session: 发出请求的 Session
+        response: 响应对象
+    """
+    if response.status_code not in BACKOFF_STATUS_CODES:
+        return
+    
+    level = _backoff_level.get(session, 0)
+    delay = min(CHECK_INTERVAL_SECONDS * 2 ** level, BACKOFF_MAX_SECONDS)
+    try:
+        delay = max(delay, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        pass
+    delay += random.uniform(0, 1)
+    
+    _backoff_until[session] = time.monotonic() + delay
+    _backoff_level[session] = level + 1
+    logger.warning("⚠️ 币安接口返回 %d，暂停请求 %.0f 秒", response.status_code, delay)
+
+
+def get_json(session: requests.Session, url: str) -> Any:
+    """
+    通过复用连接的 Session 发送 GET 请求并解析 JSON 响应
+    
+    直接解析 response.content 的字节，不经过 response.text / response.json() 的解码和编码探测。
+    
+    Args:
+        session: 对应主机的 Session（SPOT_SESSION 或 FUTURES_SESSION）
+        url: 请求地址（包含查询参数）
     
     Returns:
-        BTC价格（美元），如果失败返回 None
+        解析后的 JSON 数据；请求失败或处于限频退避期间时抛出异常，由调用方处理
+    """
+    raise_if_backing_off(session)
+    response = session.get(url, timeout=REQUEST_TIMEOUT)
+    update_backoff(session, response)
+    if not response.ok:
+        # 币安的错误响应体里带有错误码和原因（如 {"code":-1121,"msg":"Invalid symbol."}），一并记录
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+    _backoff_level.pop(session, None)  # 数据请求成功，限频连续次数清零
+    return from_json_bytes(response.content)
+
+
+def measure_spot_base(base: str) -> Optional[float]:
+    """
+    测量币安现货主机 /api/v3/ping 的往返耗时
+    
+    通过不重试的 PROBE_SESSION 发送，超时（2 秒）即返回，重试和退避等待不会计入耗时。
+    
+    Args:
+        base: 主机地址，如 https://api1.binance.com
+    
+    Returns:
+        往返耗时（秒），请求失败返回 None
     """
     try:
-        params = {'symbol': 'BTCUSDT'}
-        response = requests.get(BINANCE_API_URL, params=params, timeout=10)
+        raise_if_backing_off(SPOT_SESSION)
+        start = time.perf_counter()
+        response = PROBE_SESSION.get(base + '/api/v3/ping', timeout=2)
+        update_backoff(SPOT_SESSION, response)
         response.raise_for_status()
-        data = response.json()
-        return float(data.get('price', 0))
+        return time.perf_counter() - start
     except Exception as e:
-        print(f"获取BT价格失败: {e}")
+        logger.debug("测速 %s 失败: %s", base, e)
         return None
 
 
-def get_btc_24h_stats() -> Optional[Dict]:
+def select_spot_base():
+    """
+    并发测速所有现货候选主机，切换到延迟最低的一个
+    
+    每 SPOT_BASE_PROBE_INTERVAL_SECONDS 秒最多测速一次；全部失败时保持当前主机不变。
+    只在本地运行模式的主循环中调用：GitHub Actions 每次都是新进程、只请求一次，测速得不偿失。
+    """
+    global BINANCE_SPOT_BASE_URL, BINANCE_24H_STATS_URL, _spot_base_probed_at
+    
+    now = time.monotonic()
+    if _spot_base_probed_at is not None and now - _spot_base_probed_at < SPOT_BASE_PROBE_INTERVAL_SECONDS:
+        return
+    _spot_base_probed_at = now
+    
+    # 每个候选主机一个线程同时测速，不占用 FETCH_POOL，总耗时不超过单个主机的超时
+    with ThreadPoolExecutor(max_workers=len(BINANCE_SPOT_BASE_CANDIDATES),
+                            thread_name_prefix='btc-probe') as probe_pool:
+        rtts = dict(zip(BINANCE_SPOT_BASE_CANDIDATES,
+                        probe_pool.map(measure_spot_base, BINANCE_SPOT_BASE_CANDIDATES)))
+    reachable = {base: rtt for base, rtt in rtts.items() if rtt is not None}
+    if not reachable:
+        logger.warning("所有币安现货主机测速失败，继续使用 %s", BINANCE_SPOT_BASE_URL)
+        return
+    
+    best = min(reachable, key=reachable.get)
+    if best != BINANCE_SPOT_BASE_URL:
+        logger.info("切换币安现货主机: %s (延迟 %.0f ms)", best, reachable[best] * 1000)
+        BINANCE_SPOT_BASE_URL = best
+        BINANCE_24H_STATS_URL = best + BINANCE_24H_STATS_PATH
+
+
+def get_btc_snapshot() -> Optional[Dict]:
     """
-    从币安API获取BTC 24小时统计数据
+    从币安API获取BTC行情快照（当前价格 + 24小时统计数据）
+    
+    /ticker/24hr 已包含最新成交价，一次请求即可同时拿到价格和统计数据。
+    结果会缓存 CHECK_INTERVAL_SECONDS // 2 秒，同一轮检查内重复调用不会再次请求。
+    已启动 WebSocket 行情推送（见 start_market_streams）且推送未过期时，直接使用推送的行情。
     
     Returns:
-        包含24小时统计数据的字典，如果失败返回 None
+        包含当前价格和24小时统计数据的字典，如果失败返回 None
     """
+    global _last_snapshot, _last_snapshot_at
+    
+    now = time.monotonic()
+    if _stream_snapshot is not None and now - _stream_snapshot_at < STREAM_STALE_SECONDS:
+        return _stream_snapshot
+    if _last_snapshot is not None and now - _last_snapshot_at < SNAPSHOT_TTL_SECONDS:
+        return _last_snapshot
+    
     try:
-        params = {'symbol': 'BTCUSDT'}
-        response = requests.get(BINANCE_24H_STATS_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return {
+        data = get_json(SPOT_SESSION, BINANCE_24H_STATS_URL)
+        snapshot = {
+            'price': float(data.get('lastPrice', 0)),  # 最新价格
             'priceChange': float(data.get('priceChange', 0)),  # 24小时价格变化（美元）
             'priceChangePercent': float(data.get('priceChangePercent', 0)),  # 24小时价格变化百分比
             'highPrice': float(data.get('highPrice', 0)),  # 24小时最高价
             'lowPrice': float(data.get('lowPrice', 0)),  # 24小时最低价
-            'lastPrice': float(data.get('lastPrice', 0)),  # 最新价格
         }
     except Exception as e:
-        print(f"获取BT 24小时统计数据失败: {e}")
+        logger.error("获取BT行情快照失败: %s", e)
         return None
+    
+    _last_snapshot = snapshot
+    _last_snapshot_at = now
+    return snapshot
+
+
+def start_stream(url: str, handle_message: Callable[[Dict], None]):
+    """
+    在后台线程中订阅 WebSocket 推送，断开时自动重连
+    
+    Args:
+        url: WebSocket 地址
+        handle_message: 处理每条推送（已解析为字典）的函数
+    """
+    def on_message(ws, message):
+        try:
+            handle_message(from_json_bytes(message))
+        except Exception as e:
+            logger.warning("解析WebSocket推送失败 (%s): %s", url, e)
+    
+    def on_error(ws, error):
+        logger.warning("WebSocket连接出错 (%s): %s", url, error)
+    
+    app = websocket.WebSocketApp(url, on_message=on_message, on_error=on_error)
+    thread = threading.Thread(
+        target=app.run_forever,
+        kwargs={'reconnect': STREAM_RECONNECT_SECONDS},
+        daemon=True,
+    )
+    thread.start()
+
+
+def handle_ticker_message(data: Dict):
+    """处理现货24小时行情推送，供 get_btc_snapshot 使用"""
+    global _stream_snapshot, _stream_snapshot_at
+    
+    _stream_snapshot = {
+        'price': float(data['c']),  # 最新价格
+        'priceChange': float(data['p']),  # 24小时价格变化（美元）
+        'priceChangePercent': float(data['P']),  # 24小时价格变化百分比
+        'highPrice': float(data['h']),  # 24小时最高价
+        'lowPrice': float(data['l']),  # 24小时最低价
+    }
+    _stream_snapshot_at = time.monotonic()
+
+
+def handle_mark_price_message(data: Dict):
+    """处理期货标记价格推送（包含资金费率），供 get_futures_funding_rate 使用"""
+    global _stream_funding, _stream_funding_at
+    
+    _stream_funding = {
+        'fundingRate': float(data['r']) * 100,  # 转换为百分比
+        'nextFundingTime': int(data['T']),  # 下次资金费率时间
+    }
+    _stream_funding_at = time.monotonic()
+
+
+def start_market_streams() -> bool:
+    """
+    订阅币安 WebSocket 推送：现货24小时行情和期货标记价格（需要安装 websocket-client）
+    
+    推送的数据会被 get_btc_snapshot 和 get_futures_funding_rate 优先使用，省去每轮检查的 REST 请求；
+    推送中断期间自动回退到 REST 接口。未平仓合约量没有推送，仍走 REST 接口。
+    
+    Returns:
+        成功启动返回 True，未安装 websocket-client 返回 False
+    """
+    if websocket is None:
+        return False
+    
+    start_stream(BINANCE_WS_TICKER_URL, handle_ticker_message)
+    start_stream(BINANCE_WS_MARK_PRICE_URL, handle_mark_price_message)
+    return True
+
+
+def heartbeat_loop():
+    """每 HEARTBEAT_INTERVAL_SECONDS 秒 ping 一次币安现货和期货接口，让连接池中的连接保持可用"""
+    while True:
+        for session, url in ((SPOT_SESSION, BINANCE_SPOT_BASE_URL + '/api/v3/ping'),
+                             (FUTURES_SESSION, BINANCE_FUTURES_PING_URL)):
+            try:
+                raise_if_backing_off(session)
+                update_backoff(session, session.get(url, timeout=3))
+            except Exception as e:
+                logger.debug("心跳请求 %s 失败: %s", url, e)
+        time.sleep(HEARTBEAT_INTERVAL_SECONDS)
+
+
+def start_heartbeat():
+    """在后台线程中启动连接心跳（本地运行模式使用）"""
+    threading.Thread(target=heartbeat_loop, name='btc-heartbeat', daemon=True).start()
 
 
+@ttl_cache(OPEN_INTEREST_TTL_SECONDS)
 def get_futures_open_interest() -> Optional[float]:
     """
-    从币安期货API获取BTC未平仓合约量
+    从币安期货API获取BTC未平仓合约量，结果缓存 OPEN_INTEREST_TTL_SECONDS 秒
     
     Returns:
         未平仓合约量（BTC），如果失败返回 None
     """
     try:
-        params = {'symbol': 'BTCUSDT'}
-        response = requests.get(BINANCE_FUTURES_OPEN_INTEREST_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(FUTURES_SESSION, BINANCE_FUTURES_OPEN_INTEREST_URL)
         return float(data.get('openInterest', 0))
     except Exception as e:
-        print(f"获取未平仓合约量失败: {e}")
+        logger.error("获取未平仓合约量失败: %s", e)
         return None
 
 
@@ -131,35 +582,45 @@ def get_futures_funding_rate() -> Optional[Dict]:
     """
     从币安期货API获取BTC资金费率
     
+    已启动 WebSocket 推送（见 start_market_streams）且推送未过期时，直接使用推送的资金费率。
+    
+    Returns:
+        包含资金费率信息的字典，如果失败返回 None
+    """
+    if _stream_funding is not None and time.monotonic() - _stream_funding_at < STREAM_STALE_SECONDS:
+        return _stream_funding
+    return fetch_futures_funding_rate()
+
+
+@ttl_cache(FUNDING_RATE_TTL_SECONDS)
+def fetch_futures_funding_rate() -> Optional[Dict]:
+    """
+    通过 REST 接口（/fapi/v1/premiumIndex）获取BTC资金费率，结果缓存 FUNDING_RATE_TTL_SECONDS 秒
+    
     Returns:
         包含资金费率信息的字典，如果失败返回 None
     """
     try:
-        params = {'symbol': 'BTCUSDT'}
-        response = requests.get(BINANCE_FUTURES_PREMIUM_INDEX_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(FUTURES_SESSION, BINANCE_FUTURES_PREMIUM_INDEX_URL)
         return {
             'fundingRate': float(data.get('lastFundingRate', 0)) * 100,  # 转换为百分比
             'nextFundingTime': int(data.get('nextFundingTime', 0)),  # 下次资金费率时间
         }
     except Exception as e:
-        print(f"获取资金费率失败: {e}")
+        logger.error("获取资金费率失败: %s", e)
         return None
 
 
+@ttl_cache(FUTURES_24H_STATS_TTL_SECONDS)
 def get_futures_24h_stats() -> Optional[Dict]:
     """
-    从币安期货API获取BTC 24小时统计数据（包含爆仓相关数据）
+    从币安期货API获取BTC 24小时统计数据（包含爆仓相关数据），结果缓存 FUTURES_24H_STATS_TTL_SECONDS 秒
     
     Returns:
         包含24小时统计数据的字典，如果失败返回 None
     """
     try:
-        params = {'symbol': 'BTCUSDT'}
-        response = requests.get(BINANCE_FUTURES_24H_STATS_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(FUTURES_SESSION, BINANCE_FUTURES_24H_STATS_URL)
         return {
             'priceChange': float(data.get('priceChange', 0)),
             'priceChangePercent': float(data.get('priceChangePercent', 0)),
@@ -170,7 +631,7 @@ def get_futures_24h_stats() -> Optional[Dict]:
             'quoteVolume': float(data.get('quoteVolume', 0)),  # 24小时成交额
         }
     except Exception as e:
-        print(f"获取期货24小时统计数据失败: {e}")
+        logger.error("获取期货24小时统计数据失败: %s", e)
         return None
 
 
@@ -184,70 +645,257 @@ def send_wechat_message(message: str) -> bool:
     Returns:
         发送成功返回 True，失败返回 False
     """
-    if not WECHAT_WEBHOOK_URL or WECHAT_WEBHOOK_URL == '':
+    if not WECHAT_WEBHOOK_URL:
         return False
     
     try:
-        data = {
+        # 直接编码为 UTF-8 字节（中文不转义为 \uXXXX），不经过 requests 的 json= 序列化
+        body = to_json_bytes({
             'msgtype': 'markdown',
             'markdown': {
                 'content': message
             }
-        }
+        })
         
-        response = requests.post(WECHAT_WEBHOOK_URL, json=data, timeout=10)
+        response = WECHAT_SESSION.post(WECHAT_WEBHOOK_URL, data=body, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        result = response.json()
+        result = from_json_bytes(response.content)
         if result.get('errcode') == 0:
             return True
         else:
-            print(f"企业微信返回错误: {result.get('errmsg', '未知错误')}")
+            logger.error("企业微信返回错误: %s", result.get('errmsg', '未知错误'))
             return False
     except Exception as e:
-        print(f"发送企业微信消息失败: {e}")
+        logger.error("发送企业微信消息失败: %s", e)
         return False
 
 
-def load_state() -> Dict:
+@dataclass
+class MonitorState:
+    """两次检查之间需要持久化的监控状态（对应状态文件中的字段）"""
+    last_price: Optional[float] = None  # 上次检查的价格
+    last_check_date: Optional[str] = None  # 上次检查的日期（北京时间）
+    last_minute: Optional[str] = None  # 上次完整检查的时分（北京时间）
+    today_high: Optional[float] = None
+    today_low: Optional[float] = None
+    today_high_time: Optional[str] = None
+    today_low_time: Optional[str] = None
+    last_alert_price: Optional[float] = None  # 上次提醒时的价格
+    # 今日超过2000美元涨跌的事件记录，每条为 (类型, 价格, 时间, 涨跌)
+    daily_max_change_events: Deque[Tuple[str, float, str, float]] = field(
+        default_factory=lambda: deque(maxlen=DAILY_RECORDS_MAXLEN))
+    # 已记录事件的 (类型, 价格)，用于去重；加载时由事件记录重建，不写入状态文件
+    daily_max_change_keys: Set[Tuple[str, float]] = field(default_factory=set)
+    last_open_interest: Optional[float] = None  # 上次未平仓合约量
+    last_funding_rate: Optional[float] = None  # 上次资金费率
+    liquidation_alerts: Deque[Dict] = field(
+        default_factory=lambda: deque(maxlen=DAILY_RECORDS_MAXLEN))  # 今日爆仓提醒记录
+    # 价格历史记录（用于快速涨跌检测），按时间顺序排列
+    price_history: Deque[Dict] = field(default_factory=lambda: deque(maxlen=PRICE_HISTORY_MAXLEN))
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MonitorState':
+        """从状态文件的字典构建，忽略未知字段"""
+        known = {f.name for f in fields(cls)}
+        state = cls(**{k: v for k, v in data.items() if k in known})
+        state.daily_max_change_events = deque((
+            (e['type'], e['price'], e['time'], e['change']) if isinstance(e, dict) else tuple(e)
+            for e in state.daily_max_change_events
+        ), maxlen=DAILY_RECORDS_MAXLEN)
+        # 旧版状态文件只有事件记录，没有去重集合，统一由事件记录重建
+        state.daily_max_change_keys = {(e[0], e[1]) for e in state.daily_max_change_events}
+        state.liquidation_alerts = deque(state.liquidation_alerts, maxlen=DAILY_RECORDS_MAXLEN)
+        state.price_history = deque(state.price_history, maxlen=PRICE_HISTORY_MAXLEN)
+        return state
+    
+    def to_dict(self) -> Dict:
+        """转换为可写入状态文件的字典"""
+        data = asdict(self)
+        del data['daily_max_change_keys']  # 可由事件记录重建，不必写入
+        data['daily_max_change_events'] = list(self.daily_max_change_events)
+        data['liquidation_alerts'] = list(self.liquidation_alerts)
+        data['price_history'] = list(self.price_history)
+        return data
+    
+    def add_daily_max_change_event(self, event: Tuple[str, float, str, float]):
+        """记录一条今日涨跌事件；事件记录达到上限挤出最早一条时，同时移除它的去重 key，两者保持一致"""
+        events = self.daily_max_change_events
+        if len(events) == events.maxlen:
+            evicted = events[0]
+            self.daily_max_change_keys.discard((evicted[0], evicted[1]))
+        events.append(event)
+        self.daily_max_change_keys.add((event[0], event[1]))
+    
+    def start_new_day(self):
+        """新的一天，重置今日数据"""
+        self.today_high = None
+        self.today_low = None
+        self.today_high_time = None
+        self.today_low_time = None
+        self.last_alert_price = None
+        self.daily_max_change_events.clear()
+        self.daily_max_change_keys = set()
+        self.liquidation_alerts.clear()
+        self.price_history.clear()  # 新的一天重置价格历史
+
+
+def load_state() -> MonitorState:
     """从文件加载上次检查的状态"""
     try:
         if os.path.exists(STATE_FILE):
-            with open(STATE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(STATE_FILE, 'rb') as f:
+                return MonitorState.from_dict(from_json_bytes(f.read()))
     except Exception as e:
-        print(f"加载状态文件失败: {e}")
+        logger.error("加载状态文件失败: %s", e)
     
     # 返回默认状态
-    return {
-        'last_price': None,
-        'last_check_date': None,
-        'today_high': None,
-        'today_low': None,
-        'today_high_time': None,
-        'today_low_time': None,
-        'last_alert_price': None,  # 上次提醒时的价格
-        'daily_max_change_events': [],  # 今日超过2000美元涨跌的事件记录
-        'last_open_interest': None,  # 上次未平仓合约量
-        'last_funding_rate': None,  # 上次资金费率
-        'liquidation_alerts': [],  # 今日爆仓提醒记录
-        'price_history': []  # 价格历史记录（用于快速涨跌检测）
-    }
+    return MonitorState()
 
 
-def save_state(state: Dict):
-    """保存当前状态到文件"""
+def save_state(state: MonitorState):
+    """
+    保存当前状态到文件
+    
+    内容与上次写入完全相同时跳过写盘；否则先写临时文件再 os.replace，
+    避免进程中途退出导致状态文件损坏。
+    """
+    global _last_state_bytes
+    
+    buf = to_json_bytes(state.to_dict())
+    if buf == _last_state_bytes:
+        return
+    
+    tmp_file = STATE_FILE + '.tmp'
     try:
-        with open(STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        with open(tmp_file, 'wb') as f:
+            f.write(buf)
+        os.replace(tmp_file, STATE_FILE)
+        _last_state_bytes = buf
     except Exception as e:
-        print(f"保存状态文件失败: {e}")
+        logger.error("保存状态文件失败: %s", e)
+
+
+# ==================== 消息模板 ====================
+# 金额/百分比格式化函数，绑定一次格式串，避免每次重新解析格式说明
+_FMT_USD = "${:,.2f}".format
+_FMT_PCT = "{:+.2f}%".format
+_FMT_AMOUNT = "{:,.2f}".format
+_FMT_RATE = "{:+.4f}%".format
+
+# 价格涨跌方向 -> (图标, 文字)，按价格变化的符号取值
+_PRICE_DIRECTIONS = {
+    1: ("📈", "上涨"),
+    -1: ("📉", "下跌"),
+    0: ("➡️", "持平"),
+}
+# 以下按 “变化值 > 0” 取值 -> (图标, 方向, 风险提示)，与原先 if/else 一致，变化为 0 时按下跌处理
+_RAPID_CHANGE_DIRECTIONS = {
+    True: ("🚀", "快速上涨", "可能引发空头爆仓"),
+    False: ("⚡", "快速下跌", "可能引发多头爆仓（插针）"),
+}
+_OPEN_INTEREST_DIRECTIONS = {
+    True: ("📈", "增加", "可能预示大量新开仓，市场情绪极端"),
+    False: ("📉", "减少", "可能预示大量平仓或爆仓"),
+}
+_FUNDING_RATE_DIRECTIONS = {
+    True: ("📈", "异常高", "多头需支付高额费用，可能引发平仓"),
+    False: ("📉", "异常低", "空头需支付高额费用，可能引发平仓"),
+}
+
+# 价格提醒消息的各段模板，导入时构建一次，格式化时按需拼接
+_TEMPLATE_HEADER = """# %s BT价格提醒
+
+**🕐 更新时间（北京时间）:** %s
+
+## 💰 当前价格
+**%s**
+
+## 📊 价格变化
+**%s %s (%s)**"""
+_TEMPLATE_RANGE_HIGH = """
+
+## 📈 今日价格区间
+• **最高价:** %s"""
+_TEMPLATE_RANGE_LOW = """
+• **最低价:** %s"""
+_TEMPLATE_TIME_SUFFIX = " (%s)"
+_TEMPLATE_DAILY_MAX = """
+• **今日最大涨跌:** %s (超过%s阈值)"""
+_TEMPLATE_EVENTS_HEADER = """
+
+## ⚠️ 今日超过2000美元涨跌记录"""
+_TEMPLATE_EVENT_LINE = """
+• **%s** %s (涨跌%s) - %s"""
+_DISCLAIMER = "\n\n⚠️ *本程序仅用于信息提醒，不做任何交易决策*"
+
+# 快速涨跌提醒消息模板
+_TEMPLATE_RAPID_CHANGE = """# %s 快速%s提醒
+
+**🕐 更新时间（北京时间）:** %s
+
+## ⚠️ %s内价格剧烈波动
+
+**变化幅度:** %.2f%%
+
+**当前价格:** %s
+
+**之前价格:** %s
+
+**价格变化:** %s
+
+**风险提示:** %s
+
+⚠️ *类似coinglass插针提醒，请密切关注市场动态*"""
+
+# 爆仓/资金费率提醒消息模板
+_TEMPLATE_OPEN_INTEREST_ALERT = """# %s 爆仓风险提醒
+
+**🕐 更新时间（北京时间）:** %s
+
+## ⚠️ 未平仓合约量异常变化
+
+**变化幅度:** %s %.2f%%
+
+**当前未平仓合约量:** %s BT
+
+**当前价格:** %s
+
+**风险提示:** %s
+
+## 📊 资金费率
+**当前资金费率:** %s"""
+_TEMPLATE_FUNDING_RATE_ALERT = """# %s 资金费率异常提醒
+
+**🕐 更新时间（北京时间）:** %s
+
+## ⚠️ 资金费率%s
+
+**当前资金费率:** %s
+
+**当前价格:** %s
+
+**当前未平仓合约量:** %s BT
+
+**风险提示:** %s
+
+⚠️ *资金费率异常通常预示着市场情绪极端，可能引发大规模爆仓*"""
+_TEMPLATE_LIQUIDATION_ALERT = """# ⚠️ 爆仓风险提醒
+
+**🕐 更新时间（北京时间）:** %s
+
+**当前价格:** %s
+
+**当前未平仓合约量:** %s BT
+
+**当前资金费率:** %s"""
 
 
 def format_price_message(current_price: float, price_change: float, price_change_percent: float,
                         today_high: Optional[float] = None, today_low: Optional[float] = None,
                         today_high_time: Optional[str] = None, today_low_time: Optional[str] = None,
-                        daily_max_change_events: Optional[list] = None) -> str:
+                        daily_max_change_events: Optional[Sequence[Tuple[str, float, str, float]]] = None,
+                        beijing_time: Optional[str] = None) -> str:
     """
     格式化价格提醒消息（企业微信 Markdown 格式）
     
@@ -259,73 +907,53 @@ def format_price_message(current_price: float, price_change: float, price_change
         today_low: 今日最低价
         today_high_time: 今日最高价出现时间
         today_low_time: 今日最低价出现时间
-        daily_max_change_events: 今日超过2000美元涨跌的事件列表
+        daily_max_change_events: 今日超过2000美元涨跌的事件列表，每条为 (类型, 价格, 时间, 涨跌)，
+            只列出最近 MESSAGE_MAX_EVENTS 条
+        beijing_time: 消息中显示的更新时间，默认取当前北京时间
     
     Returns:
         格式化后的消息（Markdown格式）
     """
-    beijing_time = get_beijing_time()
+    if beijing_time is None:
+        beijing_time = get_beijing_time()
     
     # 判断涨跌
-    if price_change > 0:
-        change_symbol = "📈"
-        change_text = "上涨"
-    elif price_change < 0:
-        change_symbol = "📉"
-        change_text = "下跌"
-    else:
-        change_symbol = "➡️"
-        change_text = "持平"
+    change_symbol, change_text = _PRICE_DIRECTIONS[(price_change > 0) - (price_change < 0)]
     
-    message = f"""# {change_symbol} BT价格提醒
-
-**🕐 更新时间（北京时间）:** {beijing_time}
-
-## 💰 当前价格
-**${current_price:,.2f}**
-
-## 📊 价格变化
-**{change_text} ${abs(price_change):,.2f} ({price_change_percent:+.2f}%)**"""
+    parts = [_TEMPLATE_HEADER % (change_symbol, beijing_time, _FMT_USD(current_price),
+                                 change_text, _FMT_USD(abs(price_change)), _FMT_PCT(price_change_percent))]
     
     # 添加今日最高最低价
     if today_high is not None and today_low is not None:
-        message += f"""
-
-## 📈 今日价格区间
-• **最高价:** ${today_high:,.2f}"""
+        parts.append(_TEMPLATE_RANGE_HIGH % _FMT_USD(today_high))
         if today_high_time:
-            message += f" ({today_high_time})"
-        message += f"""
-• **最低价:** ${today_low:,.2f}"""
+            parts.append(_TEMPLATE_TIME_SUFFIX % today_high_time)
+        parts.append(_TEMPLATE_RANGE_LOW % _FMT_USD(today_low))
         if today_low_time:
-            message += f" ({today_low_time})"
+            parts.append(_TEMPLATE_TIME_SUFFIX % today_low_time)
         
         # 计算今日最大涨跌
         daily_max_change = today_high - today_low
         if daily_max_change >= DAILY_MAX_CHANGE_THRESHOLD:
-            message += f"""
-• **今日最大涨跌:** ${daily_max_change:,.2f} (超过${DAILY_MAX_CHANGE_THRESHOLD:,.2f}阈值)"""
+            parts.append(_TEMPLATE_DAILY_MAX % (_FMT_USD(daily_max_change),
+                                                _FMT_USD(DAILY_MAX_CHANGE_THRESHOLD)))
     
     # 添加超过2000美元涨跌的事件记录
-    if daily_max_change_events and len(daily_max_change_events) > 0:
-        message += """
-
-## ⚠️ 今日超过2000美元涨跌记录"""
-        for event in daily_max_change_events:
-            event_type = event.get('type', '未知')
-            event_price = event.get('price', 0)
-            event_time = event.get('time', '')
-            event_change = event.get('change', 0)
-            message += f"""
-• **{event_type}** ${event_price:,.2f} (涨跌${abs(event_change):,.2f}) - {event_time}"""
+    if daily_max_change_events:
+        parts.append(_TEMPLATE_EVENTS_HEADER)
+        for event_type, event_price, event_time, event_change in list(daily_max_change_events)[-MESSAGE_MAX_EVENTS:]:
+            parts.append(_TEMPLATE_EVENT_LINE % (
+                event_type, _FMT_USD(event_price), _FMT_USD(abs(event_change)), event_time
+            ))
     
-    message += "\n\n⚠️ *本程序仅用于信息提醒，不做任何交易决策*"
+    parts.append(_DISCLAIMER)
     
-    return message
+    return ''.join(parts)
 
 
 def format_rapid_change_message(current_price: float, price_change_percent: float,
-                                time_window: int, previous_price: float) -> str:
+                                time_window: int, previous_price: float,
+                                beijing_time: Optional[str] = None) -> str:
     """
     格式化快速涨跌提醒消息（企业微信 Markdown 格式）
     类似coinglass的声音提醒机制
@@ -335,20 +963,15 @@ def format_rapid_change_message(current_price: float, price_change_percent: floa
         price_change_percent: 价格变化百分比
         time_window: 时间窗口（秒）
         previous_price: 之前的价格
+        beijing_time: 消息中显示的更新时间，默认取当前北京时间
     
     Returns:
         格式化后的消息（Markdown格式）
     """
-    beijing_time = get_beijing_time()
+    if beijing_time is None:
+        beijing_time = get_beijing_time()
     
-    if price_change_percent > 0:
-        symbol = "🚀"
-        direction = "快速上涨"
-        risk = "可能引发空头爆仓"
-    else:
-        symbol = "⚡"
-        direction = "快速下跌"
-        risk = "可能引发多头爆仓（插针）"
+    symbol, direction, risk = _RAPID_CHANGE_DIRECTIONS[price_change_percent > 0]
     
     minutes = time_window // 60
     seconds = time_window % 60
@@ -357,32 +980,19 @@ def format_rapid_change_message(current_price: float, price_change_percent: floa
     else:
         time_str = f"{seconds}秒"
     
-    message = f"""# {symbol} 快速{direction}提醒
-
-**🕐 更新时间（北京时间）:** {beijing_time}
-
-## ⚠️ {time_str}内价格剧烈波动
-
-**变化幅度:** {abs(price_change_percent):.2f}%
-
-**当前价格:** ${current_price:,.2f}
-
-**之前价格:** ${previous_price:,.2f}
-
-**价格变化:** ${abs(current_price - previous_price):,.2f}
-
-**风险提示:** {risk}
-
-⚠️ *类似coinglass插针提醒，请密切关注市场动态*"""
-    
-    message += "\n\n⚠️ *本程序仅用于信息提醒，不做任何交易决策*"
-    
-    return message
+    return ''.join([
+        _TEMPLATE_RAPID_CHANGE % (
+            symbol, direction, beijing_time, time_str, abs(price_change_percent),
+            _FMT_USD(current_price), _FMT_USD(previous_price),
+            _FMT_USD(abs(current_price - previous_price)), risk
+        ),
+        _DISCLAIMER,
+    ])
 
 
 def format_liquidation_alert_message(current_price: float, open_interest: float, 
                                     open_interest_change: float, funding_rate: float,
-                                    alert_type: str) -> str:
+                                    alert_type: str, beijing_time: Optional[str] = None) -> str:
     """
     格式化爆仓提醒消息（企业微信 Markdown 格式）
     
@@ -392,434 +1002,420 @@ def format_liquidation_alert_message(current_price: float, open_interest: float,
         open_interest_change: 未平仓合约量变化百分比
         funding_rate: 资金费率（百分比）
         alert_type: 提醒类型（'open_interest' 或 'funding_rate'）
+        beijing_time: 消息中显示的更新时间，默认取当前北京时间
     
     Returns:
         格式化后的消息（Markdown格式）
     """
-    beijing_time = get_beijing_time()
+    if beijing_time is None:
+        beijing_time = get_beijing_time()
     
     if alert_type == 'open_interest':
-        if open_interest_change > 0:
-            symbol = "📈"
-            direction = "增加"
-            risk = "可能预示大量新开仓，市场情绪极端"
-        else:
-            symbol = "📉"
-            direction = "减少"
-            risk = "可能预示大量平仓或爆仓"
-        
-        message = f"""# {symbol} 爆仓风险提醒
-
-**🕐 更新时间（北京时间）:** {beijing_time}
-
-## ⚠️ 未平仓合约量异常变化
-
-**变化幅度:** {direction} {abs(open_interest_change):.2f}%
-
-**当前未平仓合约量:** {open_interest:,.2f} BT
-
-**当前价格:** ${current_price:,.2f}
-
-**风险提示:** {risk}
-
-## 📊 资金费率
-**当前资金费率:** {funding_rate:+.4f}%"""
+        symbol, direction, risk = _OPEN_INTEREST_DIRECTIONS[open_interest_change > 0]
+        message = _TEMPLATE_OPEN_INTEREST_ALERT % (
+            symbol, beijing_time, direction, abs(open_interest_change),
+            _FMT_AMOUNT(open_interest), _FMT_USD(current_price), risk, _FMT_RATE(funding_rate)
+        )
     
     elif alert_type == 'funding_rate':
-        if funding_rate > 0:
-            symbol = "📈"
-            direction = "异常高"
-            risk = "多头需支付高额费用，可能引发平仓"
-        else:
-            symbol = "📉"
-            direction = "异常低"
-            risk = "空头需支付高额费用，可能引发平仓"
-        
-        message = f"""# {symbol} 资金费率异常提醒
-
-**🕐 更新时间（北京时间）:** {beijing_time}
-
-## ⚠️ 资金费率{direction}
-
-**当前资金费率:** {funding_rate:+.4f}%
-
-**当前价格:** ${current_price:,.2f}
-
-**当前未平仓合约量:** {open_interest:,.2f} BT
-
-**风险提示:** {risk}
-
-⚠️ *资金费率异常通常预示着市场情绪极端，可能引发大规模爆仓*"""
+        symbol, direction, risk = _FUNDING_RATE_DIRECTIONS[funding_rate > 0]
+        message = _TEMPLATE_FUNDING_RATE_ALERT % (
+            symbol, beijing_time, direction, _FMT_RATE(funding_rate),
+            _FMT_USD(current_price), _FMT_AMOUNT(open_interest), risk
+        )
     
     else:
-        message = f"""# ⚠️ 爆仓风险提醒
-
-**🕐 更新时间（北京时间）:** {beijing_time}
-
-**当前价格:** ${current_price:,.2f}
-
-**当前未平仓合约量:** {open_interest:,.2f} BT
-
-**当前资金费率:** {funding_rate:+.4f}%"""
-    
-    message += "\n\n⚠️ *本程序仅用于信息提醒，不做任何交易决策*"
+        message = _TEMPLATE_LIQUIDATION_ALERT % (
+            beijing_time, _FMT_USD(current_price), _FMT_AMOUNT(open_interest), _FMT_RATE(funding_rate)
+        )
     
-    return message
+    return ''.join([message, _DISCLAIMER])
 
 
 def check_price_change_and_alert():
     """检查价格变化并发送提醒"""
     # 加载状态
     state = load_state()
-    last_price = state.get('last_price')
-    last_check_date = state.get('last_check_date')
-    today_high = state.get('today_high')
-    today_low = state.get('today_low')
-    today_high_time = state.get('today_high_time')
-    today_low_time = state.get('today_low_time')
-    last_alert_price = state.get('last_alert_price')
-    daily_max_change_events = state.get('daily_max_change_events', [])
-    last_open_interest = state.get('last_open_interest')
-    last_funding_rate = state.get('last_funding_rate')
-    liquidation_alerts = state.get('liquidation_alerts', [])
-    price_history = state.get('price_history', [])
     
     # 获取当前日期和时间（北京时间）
     beijing_now = get_beijing_datetime()
-    current_date = beijing_now.strftime('%Y-%m-%d')
-    current_time_str = beijing_now.strftime('%H:%M')
     current_timestamp = beijing_now.timestamp()
+    # 'YYYY-MM-DD HH:MM:SS+08:00'，按固定位置切片得到日期、时分和消息中的更新时间
+    iso = beijing_now.isoformat(' ', 'seconds')
+    current_date = iso[:10]
+    current_time_str = iso[11:16]
+    beijing_time = iso[:19]
     
     # 如果是新的一天，重置今日数据
-    is_new_day = (last_check_date != current_date)
-    if is_new_day:
-        print(f"[{get_beijing_time()}] 新的一天，重置今日数据")
-        today_high = None
-        today_low = None
-        today_high_time = None
-        today_low_time = None
-        last_alert_price = None
-        daily_max_change_events = []
-        liquidation_alerts = []
-        price_history = []  # 新的一天重置价格历史
-    
-    # 获取当前价格
-    current_price = get_btc_price()
-    if current_price is None:
-        print(f"[{get_beijing_time()}] 获取价格失败，跳过本次检查")
-        return
+    if state.last_check_date != current_date:
+        logger.info("新的一天，重置今日数据")
+        state.start_new_day()
     
-    print(f"[{get_beijing_time()}] 当前BT价格: ${current_price:,.2f}")
+    # 获取行情快照（当前价格 + 24小时统计数据，一次请求）
+    snapshot = get_btc_snapshot()
+    if snapshot is None:
+        logger.warning("获取价格失败，跳过本次检查")
+        return
+    current_price = snapshot['price']
     
-    # ==================== 快速涨跌检测（类似coinglass）====================
-    # 记录当前价格到历史
-    price_history.append({
+    # 记录当前价格到历史（跳过本轮检查时也要记录，否则快速涨跌检测的时间窗口内会缺少样本）
+    state.price_history.append({
         'timestamp': current_timestamp,
-        'price': current_price,
-        'time': current_time_str
+        'price': current_price
     })
     
-    # 清理超过时间窗口的历史记录（保留最近5分钟的数据）
+    # 清理超过时间窗口的历史记录（保留最近5分钟的数据），从左侧逐条弹出
     cutoff_time = current_timestamp - (RAPID_CHANGE_TIME_WINDOW + 300)
-    price_history = [p for p in price_history if p['timestamp'] > cutoff_time]
+    while state.price_history and state.price_history[0]['timestamp'] <= cutoff_time:
+        state.price_history.popleft()
+    
+    # 同一分钟内价格几乎没变、也没有突破今日区间时，不可能触发任何价格阈值，
+    # 只保存价格历史，跳过期货数据请求和各项提醒
+    if (state.last_price is not None
+            and abs(current_price - state.last_price) < IDLE_PRICE_DELTA
+            and current_time_str == state.last_minute
+            and state.today_high is not None
+            and state.today_low < current_price < state.today_high):
+        logger.info("当前BT价格: $%.2f (变化不足 $%.2f，跳过本轮检查)", current_price, IDLE_PRICE_DELTA)
+        save_state(state)
+        return
     
+    logger.info("当前BT价格: $%.2f", current_price)
+    
+    # 今日已发送提醒的 key 集合，用于 O(1) 去重
+    alert_keys = {a['key'] for a in state.liquidation_alerts if 'key' in a}
+    
+    # 提前并发获取未平仓合约量和资金费率，与下面的价格检测（可能发送企业微信消息）同时进行
+    open_interest_future = FETCH_POOL.submit(get_futures_open_interest)
+    funding_future = FETCH_POOL.submit(get_futures_funding_rate)
+    
+    # ==================== 快速涨跌检测（类似coinglass）====================
     # 检测快速涨跌
-    if len(price_history) >= 2:
-        # 找到时间窗口内的最早价格
-        window_start_time = current_timestamp - RAPID_CHANGE_TIME_WINDOW
-        window_prices = [p for p in price_history if p['timestamp'] >= window_start_time]
+    # 找到时间窗口内的最早价格：从左往右遇到的第一条窗口内记录即是
+    window_start_time = current_timestamp - RAPID_CHANGE_TIME_WINDOW
+    oldest_in_window = None
+    for p in state.price_history:
+        if p['timestamp'] >= window_start_time:
+            oldest_in_window = p
+            break
+    
+    # 窗口内除当前价格外至少还要有一条记录
+    if oldest_in_window is not None and oldest_in_window is not state.price_history[-1]:
+        oldest_price_in_window = oldest_in_window['price']
+        price_change_percent = ((current_price - oldest_price_in_window) / oldest_price_in_window) * 100
+        abs_change_percent = abs(price_change_percent)
         
-        if len(window_prices) >= 2:
-            oldest_price_in_window = window_prices[0]['price']
-            price_change_percent = ((current_price - oldest_price_in_window) / oldest_price_in_window) * 100
-            abs_change_percent = abs(price_change_percent)
-            
-            if abs_change_percent >= RAPID_CHANGE_THRESHOLD:
-                # 检查是否已经提醒过（避免重复提醒）
-                alert_key = f"rapid_{current_time_str}"
-                if alert_key not in [a.get('key') for a in liquidation_alerts]:
-                    print(f"  ⚡ 检测到快速涨跌: {price_change_percent:+.2f}% ({RAPID_CHANGE_TIME_WINDOW}秒内)")
-                    rapid_message = format_rapid_change_message(
-                        current_price=current_price,
-                        price_change_percent=price_change_percent,
-                        time_window=RAPID_CHANGE_TIME_WINDOW,
-                        previous_price=oldest_price_in_window
-                    )
-                    
-                    success = send_wechat_message(rapid_message)
-                    if success:
-                        print(f"  ✅ 已发送快速涨跌提醒到企业微信")
-                        liquidation_alerts.append({
-                            'key': alert_key,
-                            'type': 'rapid_change',
-                            'time': f"{current_date} {current_time_str}",
-                            'change_percent': price_change_percent
-                        })
-                    else:
-                        print(f"  ❌ 发送快速涨跌提醒失败")
+        if abs_change_percent >= RAPID_CHANGE_THRESHOLD:
+            # 检查是否已经提醒过（避免重复提醒）
+            alert_key = f"rapid_{current_time_str}"
+            if alert_key not in alert_keys:
+                logger.info("  ⚡ 检测到快速涨跌: %+.2f%% (%d秒内)", price_change_percent, RAPID_CHANGE_TIME_WINDOW)
+                rapid_message = format_rapid_change_message(
+                    current_price=current_price,
+                    price_change_percent=price_change_percent,
+                    time_window=RAPID_CHANGE_TIME_WINDOW,
+                    previous_price=oldest_price_in_window,
+                    beijing_time=beijing_time
+                )
+                
+                success = send_wechat_message(rapid_message)
+                if success:
+                    logger.info("  ✅ 已发送快速涨跌提醒到企业微信")
+                    state.liquidation_alerts.append({
+                        'key': alert_key,
+                        'type': 'rapid_change',
+                        'time': f"{current_date} {current_time_str}",
+                        'change_percent': price_change_percent
+                    })
+                    alert_keys.add(alert_key)
                 else:
-                    print(f"  快速涨跌: {price_change_percent:+.2f}% (已提醒过)")
+                    logger.error("  ❌ 发送快速涨跌提醒失败")
             else:
-                print(f"  价格变化: {price_change_percent:+.2f}% ({RAPID_CHANGE_TIME_WINDOW}秒内，正常范围)")
+                logger.info("  快速涨跌: %+.2f%% (已提醒过)", price_change_percent)
+        else:
+            logger.debug("  价格变化: %+.2f%% (%d秒内，正常范围)", price_change_percent, RAPID_CHANGE_TIME_WINDOW)
     
     # 更新今日最高最低价
-    if today_high is None or current_price > today_high:
-        today_high = current_price
-        today_high_time = current_time_str
-        print(f"  更新今日最高价: ${today_high:,.2f} ({today_high_time})")
+    if state.today_high is None or current_price > state.today_high:
+        state.today_high = current_price
+        state.today_high_time = current_time_str
+        logger.debug("  更新今日最高价: $%.2f (%s)", state.today_high, state.today_high_time)
     
-    if today_low is None or current_price < today_low:
-        today_low = current_price
-        today_low_time = current_time_str
-        print(f"  更新今日最低价: ${today_low:,.2f} ({today_low_time})")
+    if state.today_low is None or current_price < state.today_low:
+        state.today_low = current_price
+        state.today_low_time = current_time_str
+        logger.debug("  更新今日最低价: $%.2f (%s)", state.today_low, state.today_low_time)
     
     # 计算今日最大涨跌
-    if today_high is not None and today_low is not None:
-        daily_max_change = today_high - today_low
+    if state.today_high is not None and state.today_low is not None:
+        daily_max_change = state.today_high - state.today_low
         if daily_max_change >= DAILY_MAX_CHANGE_THRESHOLD:
-            # 检查是否已经记录过这个事件
-            event_exists = False
-            for event in daily_max_change_events:
-                if (event.get('type') == '最高价' and event.get('price') == today_high) or \
-                   (event.get('type') == '最低价' and event.get('price') == today_low):
-                    event_exists = True
-                    break
-            
-            # 如果当前价格是最高价或最低价，且超过阈值，记录事件
-            if not event_exists:
-                if current_price == today_high:
-                    daily_max_change_events.append({
-                        'type': '最高价',
-                        'price': today_high,
-                        'time': f"{current_date} {today_high_time}",
-                        'change': daily_max_change
-                    })
-                    print(f"  记录超过${DAILY_MAX_CHANGE_THRESHOLD:,.2f}涨跌事件: 最高价 ${today_high:,.2f} ({current_date} {today_high_time})")
-                elif current_price == today_low:
-                    daily_max_change_events.append({
-                        'type': '最低价',
-                        'price': today_low,
-                        'time': f"{current_date} {today_low_time}",
-                        'change': daily_max_change
-                    })
-                    print(f"  记录超过${DAILY_MAX_CHANGE_THRESHOLD:,.2f}涨跌事件: 最低价 ${today_low:,.2f} ({current_date} {today_low_time})")
+            # 如果当前价格是最高价或最低价，且超过阈值，记录事件（同一价格只记录一次）
+            if current_price == state.today_high:
+                key = ('最高价', state.today_high)
+                if key not in state.daily_max_change_keys:
+                    state.add_daily_max_change_event(
+                        ('最高价', state.today_high, f"{current_date} {state.today_high_time}", daily_max_change)
+                    )
+                    logger.info("  记录超过$%.2f涨跌事件: 最高价 $%.2f (%s %s)",
+                                DAILY_MAX_CHANGE_THRESHOLD, state.today_high, current_date, state.today_high_time)
+            if current_price == state.today_low:
+                key = ('最低价', state.today_low)
+                if key not in state.daily_max_change_keys:
+                    state.add_daily_max_change_event(
+                        ('最低价', state.today_low, f"{current_date} {state.today_low_time}", daily_max_change)
+                    )
+                    logger.info("  记录超过$%.2f涨跌事件: 最低价 $%.2f (%s %s)",
+                                DAILY_MAX_CHANGE_THRESHOLD, state.today_low, current_date, state.today_low_time)
     
     # 计算价格变化（相对于上次提醒时的价格）
     should_alert = False
     price_change = 0
     price_change_percent = 0
     
-    if last_alert_price is not None:
-        price_change = current_price - last_alert_price
-        price_change_percent = (price_change / last_alert_price) * 100
+    if state.last_alert_price is not None:
+        price_change = current_price - state.last_alert_price
+        price_change_percent = (price_change / state.last_alert_price) * 100
         abs_price_change = abs(price_change)
         
         # 检查是否超过提醒阈值（500美元）
         if abs_price_change >= PRICE_CHANGE_THRESHOLD:
             should_alert = True
-            print(f"  价格变化超过提醒阈值: ${abs_price_change:,.2f} (阈值: ${PRICE_CHANGE_THRESHOLD:,.2f})")
-    elif last_price is None:
+            logger.info("  价格变化超过提醒阈值: $%.2f (阈值: $%.2f)", abs_price_change, PRICE_CHANGE_THRESHOLD)
+    elif state.last_price is None:
         # 首次运行，不发送提醒，记录初始价格作为提醒基准
-        print("  首次运行，记录初始价格")
-        last_alert_price = current_price
+        logger.info("  首次运行，记录初始价格")
+        state.last_alert_price = current_price
     else:
         # 有上次价格但没有上次提醒价格（可能是新的一天），计算变化
-        price_change = current_price - last_price
-        price_change_percent = (price_change / last_price) * 100
+        price_change = current_price - state.last_price
+        price_change_percent = (price_change / state.last_price) * 100
         abs_price_change = abs(price_change)
         
         if abs_price_change >= PRICE_CHANGE_THRESHOLD:
             should_alert = True
-            last_alert_price = last_price  # 使用上次价格作为基准
-            print(f"  价格变化超过提醒阈值: ${abs_price_change:,.2f} (阈值: ${PRICE_CHANGE_THRESHOLD:,.2f})")
+            state.last_alert_price = state.last_price  # 使用上次价格作为基准
+            logger.info("  价格变化超过提醒阈值: $%.2f (阈值: $%.2f)", abs_price_change, PRICE_CHANGE_THRESHOLD)
         else:
             # 如果不在提醒范围内，也设置提醒基准价格，避免下次误判
-            if last_alert_price is None:
-                last_alert_price = current_price
+            if state.last_alert_price is None:
+                state.last_alert_price = current_price
     
     # 如果需要发送提醒
     if should_alert:
-        # 获取24小时统计数据用于显示
-        stats_24h = get_btc_24h_stats()
-        if stats_24h:
-            price_change_percent = stats_24h.get('priceChangePercent', price_change_percent)
+        # 使用行情快照中的24小时涨跌比例用于显示
+        price_change_percent = snapshot['priceChangePercent']
         
         # 格式化消息
         message = format_price_message(
             current_price=current_price,
             price_change=price_change,
             price_change_percent=price_change_percent,
-            today_high=today_high,
-            today_low=today_low,
-            today_high_time=today_high_time,
-            today_low_time=today_low_time,
-            daily_max_change_events=daily_max_change_events
+            today_high=state.today_high,
+            today_low=state.today_low,
+            today_high_time=state.today_high_time,
+            today_low_time=state.today_low_time,
+            daily_max_change_events=state.daily_max_change_events,
+            beijing_time=beijing_time
         )
         
         # 发送到企业微信
         success = send_wechat_message(message)
         if success:
-            print(f"  ✅ 已发送价格提醒到企业微信")
+            logger.info("  ✅ 已发送价格提醒到企业微信")
             # 更新上次提醒价格
-            last_alert_price = current_price
+            state.last_alert_price = current_price
         else:
-            print(f"  ❌ 发送价格提醒失败")
+            logger.error("  ❌ 发送价格提醒失败")
     else:
-        if last_price is not None:
-            price_change = current_price - last_price
-            print(f"  价格变化: ${price_change:,.2f} (不在提醒范围内)")
+        if state.last_price is not None:
+            price_change = current_price - state.last_price
+            logger.info("  价格变化: $%.2f (不在提醒范围内)", price_change)
     
     # ==================== 爆仓风险检测 ====================
-    print(f"\n[爆仓监控] 开始检测爆仓风险...")
+    logger.info("[爆仓监控] 开始检测爆仓风险...")
     
-    # 获取未平仓合约量和资金费率
-    open_interest = get_futures_open_interest()
-    funding_data = get_futures_funding_rate()
+    # 获取未平仓合约量和资金费率（已在上面并发发起请求）
+    open_interest = open_interest_future.result()
+    funding_data = funding_future.result()
     
     if open_interest is not None and funding_data is not None:
         funding_rate = funding_data['fundingRate']
-        print(f"  当前未平仓合约量: {open_interest:,.2f} BT")
-        print(f"  当前资金费率: {funding_rate:+.4f}%")
+        logger.info("  当前未平仓合约量: %.2f BT", open_interest)
+        logger.info("  当前资金费率: %+.4f%%", funding_rate)
         
         # 检测未平仓合约量异常变化
-        if last_open_interest is not None and last_open_interest > 0:
-            open_interest_change = ((open_interest - last_open_interest) / last_open_interest) * 100
+        if state.last_open_interest is not None and state.last_open_interest > 0:
+            open_interest_change = ((open_interest - state.last_open_interest) / state.last_open_interest) * 100
             abs_change = abs(open_interest_change)
             
             if abs_change >= OPEN_INTEREST_CHANGE_THRESHOLD:
                 # 检查是否已经提醒过（避免重复提醒）
                 alert_key = f"oi_{current_time_str}"
-                if alert_key not in [a.get('key') for a in liquidation_alerts]:
-                    print(f"  ⚠️ 未平仓合约量异常变化: {open_interest_change:+.2f}%")
+                if alert_key not in alert_keys:
+                    logger.info("  ⚠️ 未平仓合约量异常变化: %+.2f%%", open_interest_change)
                     liquidation_message = format_liquidation_alert_message(
                         current_price=current_price,
                         open_interest=open_interest,
                         open_interest_change=open_interest_change,
                         funding_rate=funding_rate,
-                        alert_type='open_interest'
+                        alert_type='open_interest',
+                        beijing_time=beijing_time
                     )
                     
                     success = send_wechat_message(liquidation_message)
                     if success:
-                        print(f"  ✅ 已发送爆仓风险提醒到企业微信")
-                        liquidation_alerts.append({
+                        logger.info("  ✅ 已发送爆仓风险提醒到企业微信")
+                        state.liquidation_alerts.append({
                             'key': alert_key,
                             'type': 'open_interest',
                             'time': f"{current_date} {current_time_str}",
                             'change': open_interest_change
                         })
+                        alert_keys.add(alert_key)
                     else:
-                        print(f"  ❌ 发送爆仓风险提醒失败")
+                        logger.error("  ❌ 发送爆仓风险提醒失败")
                 else:
-                    print(f"  未平仓合约量变化: {open_interest_change:+.2f}% (已提醒过)")
+                    logger.info("  未平仓合约量变化: %+.2f%% (已提醒过)", open_interest_change)
             else:
-                print(f"  未平仓合约量变化: {open_interest_change:+.2f}% (正常范围)")
+                logger.debug("  未平仓合约量变化: %+.2f%% (正常范围)", open_interest_change)
         else:
-            print(f"  首次获取未平仓合约量，记录基准值")
+            logger.info("  首次获取未平仓合约量，记录基准值")
         
         # 检测资金费率异常
         if funding_rate >= FUNDING_RATE_HIGH_THRESHOLD or funding_rate <= FUNDING_RATE_LOW_THRESHOLD:
             # 检查是否已经提醒过（避免重复提醒）
             alert_key = f"fr_{current_time_str}"
-            if alert_key not in [a.get('key') for a in liquidation_alerts]:
-                print(f"  ⚠️ 资金费率异常: {funding_rate:+.4f}%")
+            if alert_key not in alert_keys:
+                logger.info("  ⚠️ 资金费率异常: %+.4f%%", funding_rate)
                 liquidation_message = format_liquidation_alert_message(
                     current_price=current_price,
                     open_interest=open_interest,
                     open_interest_change=0,
                     funding_rate=funding_rate,
-                    alert_type='funding_rate'
+                    alert_type='funding_rate',
+                    beijing_time=beijing_time
                 )
                 
                 success = send_wechat_message(liquidation_message)
                 if success:
-                    print(f"  ✅ 已发送资金费率异常提醒到企业微信")
-                    liquidation_alerts.append({
+                    logger.info("  ✅ 已发送资金费率异常提醒到企业微信")
+                    state.liquidation_alerts.append({
                         'key': alert_key,
                         'type': 'funding_rate',
                         'time': f"{current_date} {current_time_str}",
                         'rate': funding_rate
                     })
+                    alert_keys.add(alert_key)
                 else:
-                    print(f"  ❌ 发送资金费率异常提醒失败")
+                    logger.error("  ❌ 发送资金费率异常提醒失败")
             else:
-                print(f"  资金费率: {funding_rate:+.4f}% (已提醒过)")
+                logger.info("  资金费率: %+.4f%% (已提醒过)", funding_rate)
         else:
-            print(f"  资金费率: {funding_rate:+.4f}% (正常范围)")
+            logger.debug("  资金费率: %+.4f%% (正常范围)", funding_rate)
     else:
-        print(f"  ⚠️ 获取爆仓监控数据失败，跳过本次检测")
+        logger.warning("  ⚠️ 获取爆仓监控数据失败，跳过本次检测")
     
     # 保存状态
-    new_state = {
-        'last_price': current_price,
-        'last_check_date': current_date,
-        'today_high': today_high,
-        'today_low': today_low,
-        'today_high_time': today_high_time,
-        'today_low_time': today_low_time,
-        'last_alert_price': last_alert_price,
-        'daily_max_change_events': daily_max_change_events,
-        'last_open_interest': open_interest if open_interest is not None else last_open_interest,
-        'last_funding_rate': funding_data['fundingRate'] if funding_data is not None else last_funding_rate,
-        'liquidation_alerts': liquidation_alerts,
-        'price_history': price_history
-    }
-    save_state(new_state)
+    state.last_price = current_price
+    state.last_check_date = current_date
+    state.last_minute = current_time_str
+    if open_interest is not None:
+        state.last_open_interest = open_interest
+    if funding_data is not None:
+        state.last_funding_rate = funding_data['fundingRate']
+    save_state(state)
+
+
+def setup_logging():
+    """
+    配置日志输出：输出到标准输出，时间戳使用北京时间
+    
+    日志级别由环境变量 LOG_LEVEL 控制（默认 INFO），无法识别的级别回退到 INFO 并给出警告。
+    """
+    formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    formatter.converter = lambda ts: datetime.fromtimestamp(ts, BEIJING_TZ).timetuple()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(formatter)
+    
+    level_name = (os.getenv('LOG_LEVEL') or 'INFO').strip().upper()
+    level = logging.getLevelName(level_name)  # 已知级别返回数值，未知级别返回 'Level XXX' 字符串
+    logging.basicConfig(level=level if isinstance(level, int) else logging.INFO, handlers=[handler])
+    if not isinstance(level, int):
+        logger.warning("⚠️ 无法识别的日志级别 LOG_LEVEL=%s，使用 INFO", level_name)
 
 
 def main():
     """主程序"""
-    print("=" * 60)
-    print("BT价格监控程序")
-    print("=" * 60)
-    
-    # 检查配置
-    if not WECHAT_WEBHOOK_URL or WECHAT_WEBHOOK_URL == '':
-        print("⚠️  警告: 未配置企业微信 Webhook URL")
-        print("   程序将运行但不会发送消息")
-        print("   请设置环境变量 WECHAT_WEBHOOK_URL 或在代码中配置")
-        print()
-    
-    print(f"检查间隔: {CHECK_INTERVAL_SECONDS}秒")
-    print(f"价格变化提醒阈值: 超过 ${PRICE_CHANGE_THRESHOLD:,.2f}")
-    print(f"今日最大涨跌阈值: ${DAILY_MAX_CHANGE_THRESHOLD:,.2f}")
-    print("=" * 60)
-    print()
+    setup_logging()
     
     # 检查是否在GitHub Actions中运行（单次运行模式）
     is_github_actions = os.getenv('GITHUB_ACTIONS') == 'true'
+    # 单次运行模式不测速切换现货主机，只需预解析当前使用的主机
+    prewarm_dns(include_spot_mirrors=not is_github_actions)
+    
+    logger.info("=" * 60)
+    logger.info("BT价格监控程序")
+    logger.info("=" * 60)
+    
+    # 检查配置
+    if not WECHAT_WEBHOOK_URL:
+        logger.warning("⚠️  警告: 未配置企业微信 Webhook URL")
+        logger.warning("   程序将运行但不会发送消息")
+        logger.warning("   请设置环境变量 WECHAT_WEBHOOK_URL 或在代码中配置")
+    
+    logger.info("检查间隔: %d秒", CHECK_INTERVAL_SECONDS)
+    logger.info("价格变化提醒阈值: 超过 $%.2f", PRICE_CHANGE_THRESHOLD)
+    logger.info("今日最大涨跌阈值: $%.2f", DAILY_MAX_CHANGE_THRESHOLD)
+    logger.info("=" * 60)
     
     # 调试信息
-    print(f"环境变量 GITHUB_ACTIONS: {os.getenv('GITHUB_ACTIONS')}")
-    print(f"检测到GitHub Actions环境: {is_github_actions}")
-    print()
+    logger.debug("环境变量 GITHUB_ACTIONS: %s", os.getenv('GITHUB_ACTIONS'))
+    logger.debug("检测到GitHub Actions环境: %s", is_github_actions)
     
     if is_github_actions:
         # GitHub Actions模式：只运行一次
-        print("=" * 60)
-        print("GitHub Actions模式：执行单次检查")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("GitHub Actions模式：执行单次检查")
+        logger.info("=" * 60)
         try:
             check_price_change_and_alert()
-            print("=" * 60)
-            print("✅ 检查完成！程序退出")
-            print("=" * 60)
+            logger.info("=" * 60)
+            logger.info("✅ 检查完成！程序退出")
+            logger.info("=" * 60)
         except Exception as e:
-            print(f"\n❌ 程序运行出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 程序运行出错: %s", e)
             raise
     else:
         # 本地运行模式：持续运行
+        if start_market_streams():
+            logger.info("已启动 WebSocket 行情推送，价格将优先使用推送数据")
+        else:
+            logger.info("未安装 websocket-client，使用 REST 接口轮询价格")
+        start_heartbeat()
+        
         try:
+            # 按固定节拍调度：检查耗时计入本轮间隔，不会累积漂移
+            next_tick = time.monotonic()
             while True:
+                # 定期选择延迟最低的币安现货主机
+                select_spot_base()
                 check_price_change_and_alert()
-                print(f"等待 {CHECK_INTERVAL_SECONDS} 秒后继续检查...\n")
-                time.sleep(CHECK_INTERVAL_SECONDS)
+                next_tick += CHECK_INTERVAL_SECONDS
+                now = time.monotonic()
+                if now > next_tick + CHECK_INTERVAL_SECONDS:
+                    # 落后超过一个周期（如网络长时间卡住），从当前时间重新对齐节拍，避免连续补跑
+                    next_tick = now
+                sleep_for = max(0.0, next_tick - now)
+                if sleep_for == 0:
+                    logger.warning("⚠️ 本轮检查耗时超过 %d 秒，立即开始下一轮", CHECK_INTERVAL_SECONDS)
+                else:
+                    logger.info("等待 %.1f 秒后继续检查...", sleep_for)
+                time.sleep(sleep_for)
         except KeyboardInterrupt:
-            print("\n程序已停止")
+            logger.info("程序已停止")
         except Exception as e:
-            print(f"\n程序运行出错: {e}")
+            logger.error("程序运行出错: %s", e)
             raise
 
 